@@ -0,0 +1,147 @@
+"""
+Helpers shared by bump-conan.py and bump-vcpkg.py.
+
+bootstrap.sh copies everything in scripts/ to ~/bin, so this module installs
+next to the scripts and is importable from them directly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import os
+import pathlib
+import re
+import shutil
+import ssl
+import subprocess
+import sys
+import threading
+import urllib.error
+import urllib.request
+from typing import Optional
+
+# Tarball hashes keyed by "<algo> <url>" along with the ETag they were computed for, so re-running
+# a bump for a version that was already downloaded only costs a conditional request.
+HASH_CACHE = pathlib.Path(os.environ.get("XDG_CACHE_HOME") or "~/.cache").expanduser() / "bump-scripts" / "hashes.json"
+
+_hash_cache_lock = threading.Lock()
+
+# owner/repo from a GitHub remote url (ssh or https)
+_GITHUB_REMOTE_RE = re.compile(r'[:/](?P<owner>[^/]+)/(?P<repo>[^/]+?)(\.git)?$')
+
+
+def load_hash_cache() -> dict:
+    try:
+        return json.loads(HASH_CACHE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def store_hash_cache(key: str, etag: str, digest: str):
+    with _hash_cache_lock:  # hashes for several bumps are computed concurrently
+        cache = load_hash_cache()
+        cache[key] = {"etag": etag, "hash": digest}
+        HASH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = HASH_CACHE.with_name(f"{HASH_CACHE.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+        os.replace(tmp, HASH_CACHE)
+
+
+def hash_stream(resp, algo: str) -> str:
+    if hasattr(hashlib, "file_digest"):  # Python 3.11+, hashing loop runs in C
+        return hashlib.file_digest(resp, algo).hexdigest()
+    # Hash in chunks rather than buffering the whole archive in memory
+    h = hashlib.new(algo)
+    for chunk in iter(lambda: resp.read(1 << 16), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def tarball_hash(url: str, algo: str, context: Optional[ssl.SSLContext] = None) -> str:
+    """Download *url* and return its *algo* hex digest, revalidating against the hash cache."""
+    key = f"{algo} {url}"
+    cached = load_hash_cache().get(key)
+    req = urllib.request.Request(url)
+    if cached:
+        req.add_header("If-None-Match", cached["etag"])
+    try:
+        with urllib.request.urlopen(req, context=context) as resp:
+            etag = resp.headers.get("ETag")
+            digest = hash_stream(resp, algo)
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached:
+            print(f"[info] {url} unchanged, using cached {algo}")
+            return cached["hash"]
+        raise
+    if etag:
+        store_hash_cache(key, etag, digest)
+    return digest
+
+
+class GitHubSession:
+    """Creates PRs through the GitHub REST API over one keep-alive connection.
+
+    Spawning `gh pr create` re-reads config and re-dials GitHub for every PR; here
+    the token is fetched from `gh` once and reused for all bumps in the run.
+    """
+
+    def __init__(self, upstream_remote: str, push_remote: str, user_agent: str, token: str):
+        # PRs go against the upstream repo from a branch on the fork
+        self.repo = github_slug(upstream_remote)
+        self.fork_owner = github_slug(push_remote).split("/")[0]
+        self.token = token
+        self.user_agent = user_agent
+        # The connection sits idle through long builds, don't let a stalled socket hang the script
+        self.conn = http.client.HTTPSConnection("api.github.com", timeout=30)
+
+    def _post(self, path: str, payload: bytes):
+        self.conn.request("POST", path, body=payload, headers={
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+            "Content-Type": "application/json",
+            "User-Agent": self.user_agent,
+        })
+        resp = self.conn.getresponse()
+        return resp.status, resp.read()
+
+    def create_pr(self, branch: str, base: str, title: str, body: str) -> str:
+        path = f"/repos/{self.repo}/pulls"
+        head = f"{self.fork_owner}:{branch}"
+        payload = json.dumps({"title": title, "body": body, "head": head, "base": base}).encode()
+        print(f"[info] opening PR against {self.repo} from {head}")
+        try:
+            status, data = self._post(path, payload)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # The idle connection was dropped while building, reconnect once
+            self.conn.close()
+            status, data = self._post(path, payload)
+        if status != 201:
+            sys.exit(f"[error] PR creation failed ({status}): {data.decode(errors='replace')}")
+        return json.loads(data)["html_url"]
+
+
+def github_slug(remote: str) -> str:
+    """Return "owner/repo" for a GitHub *remote*."""
+    url = subprocess.run(
+        ["git", "remote", "get-url", remote], check=True, text=True, stdout=subprocess.PIPE
+    ).stdout.strip()
+    m = _GITHUB_REMOTE_RE.search(url)
+    if not m:
+        sys.exit(f"[error] Cannot extract GitHub owner/repo from {remote} url: {url}")
+    return f"{m.group('owner')}/{m.group('repo')}"
+
+
+def open_github_session(upstream_remote: str, push_remote: str, user_agent: str) -> Optional[GitHubSession]:
+    """Return a GitHubSession, or None if `gh` is missing or not logged in."""
+    if not shutil.which("gh"):
+        return None
+    try:
+        token = subprocess.run(
+            ["gh", "auth", "token"], check=True, text=True, stdout=subprocess.PIPE
+        ).stdout.strip()
+    except subprocess.CalledProcessError:
+        print("[warn] `gh auth token` failed — is gh logged in? PRs will have to be opened manually")
+        return None
+    return GitHubSession(upstream_remote, push_remote, user_agent, token)
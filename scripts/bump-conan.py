@@ -23,15 +23,19 @@ conan-center-index (or any similar) repository.
 
 Usage
 ------------
-    ./bump-conan.py <recipe> <new-version>
+    ./bump-conan.py <recipe> <new-version> [<recipe> <new-version> ...]
     # e.g.
     ./bump-conan.py cpptrace 1.0.1
+    ./bump-conan.py cpptrace 1.0.1 libassert 2.1.5
+
+Each recipe gets its own branch, commit, and PR. Tarballs for all of them are
+downloaded and hashed concurrently up front.
 
 Requirements
 ------------
 - Python≥3.8
 - **ruamel.yaml** (`pip install ruamel.yaml`) — round‑trip loader that keeps comments intact
-- Optionally the GitHub CLI (`gh`) if you want automatic PR creation
+- Optionally the GitHub CLI (`gh`), logged in, if you want automatic PR creation
 
 """
 
@@ -39,20 +43,18 @@ from __future__ import annotations
 
 import copy
 import argparse
-import hashlib
-import os
+import concurrent.futures
 import pathlib
 import re
 import shlex
-import shutil
 import subprocess
 import sys
-import tempfile
 import textwrap
-import urllib.request
 import ssl
 from typing import Optional
 
+from _bump_common import GitHubSession, open_github_session, tarball_hash
+
 # ---------------------------------------------------------------------------
 # YAML helper (round‑trip)
 # ---------------------------------------------------------------------------
@@ -68,6 +70,16 @@ yaml_rt = YAML(typ="rt")  # keep comments
 yaml_rt.preserve_quotes = True
 yaml_rt.indent(mapping=2, sequence=4, offset=2)
 
+# Version fragment that precedes a standard archive suffix (tar.gz/zip/etc.)
+_VERSION_RE = re.compile(r"(v?)(\d+\.\d+\.\d+(?:[A-Za-z0-9_-]*)?)(?=\.(?:tar\.gz|zip))")
+# Fallback: stop at first dot that precedes the extension
+_VERSION_RE_LOOSE = re.compile(r"(v?)(\d+\.\d+\.\d+(?:[A-Za-z0-9_-]*)?)")
+# A `"<version>":` key line under config.yml's `versions:` or conandata.yml's `sources:`
+_VERSION_KEY_RE = re.compile(r"""^\s+(["']?)(?P<key>[^"'\s:]+)\1:""")
+_CONFIG_FOLDER_RE = re.compile(r"""^\s+folder:[ \t]*(["']?)(?P<folder>[^"'\s#]+)\1""")
+# A single-line `url: "..."` entry in conandata.yml
+_SOURCE_URL_RE = re.compile(r"""^\s+url:[ \t]*(["']?)(?P<url>[^"'\s#]+)\1[ \t]*$""")
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -75,14 +87,12 @@ yaml_rt.indent(mapping=2, sequence=4, offset=2)
 def run(cmd: list[str] | str, *, cwd: Optional[str] = None, check: bool = True):
     printable = cmd if isinstance(cmd, str) else " ".join(map(shlex.quote, cmd))
     print(f"[exec] {printable}")
+    sys.stdout.flush()
     subprocess.run(cmd, shell=isinstance(cmd, str), cwd=cwd, check=check)
 
 
 def compute_sha256(url: str) -> str:
-    ctx = ssl.create_default_context()
-    with urllib.request.urlopen(url, context=ctx) as resp:
-        data = resp.read()
-    return hashlib.sha256(data).hexdigest()
+    return tarball_hash(url, "sha256", context=ssl.create_default_context())
 
 
 # ────────────────────────────────────────────────────────────────────────────
@@ -99,25 +109,94 @@ def save_yaml(path_: pathlib.Path, data):
         yaml_rt.dump(data, f)
 
 
-def derive_tarball_url(data, new_version: str) -> str:
-    """Return a source URL for *new_version* by cloning the first existing one.
+def _indent_of(line: str) -> int:
+    return len(line) - len(line.lstrip())
 
-    We swap **only** the version segment (handling an optional leading "v") and
-    leave everything else – including the `.tar.gz`, `.zip`, or any other
-    extension – untouched.
+
+def _is_content(line: str) -> bool:
+    stripped = line.strip()
+    return bool(stripped) and not stripped.startswith("#")
+
+
+def version_entries(lines: list[str], block: str):
+    """Find the version keys directly under the top-level *block* map (`versions` or `sources`).
+
+    Returns a list of (line index, key match) in file order and the indentation
+    of the keys.
+    """
+    try:
+        block_start = next(
+            i for i, line in enumerate(lines) if line.split("#", 1)[0].rstrip() == f"{block}:"
+        ) + 1
+    except StopIteration:
+        block_start = len(lines)
+
+    entries = []
+    key_indent = None
+    for i in range(block_start, len(lines)):
+        line = lines[i]
+        if not _is_content(line):
+            continue
+        if _indent_of(line) == 0:
+            break
+        if key_indent is None:
+            key_indent = _indent_of(line)
+        if _indent_of(line) == key_indent:
+            m = _VERSION_KEY_RE.match(line)
+            if m:
+                entries.append((i, m))
+    return entries, key_indent
+
+
+def entry_end(lines: list[str], start: int, key_indent: int) -> int:
+    """Return the index one past the last line of the entry whose key is on line *start*."""
+    end = start + 1
+    while end < len(lines) and (not _is_content(lines[end]) or _indent_of(lines[end]) > key_indent):
+        end += 1
+    while end > start + 1 and not _is_content(lines[end - 1]):
+        end -= 1  # trailing blank/comment lines belong to the gap, not the entry
+    return end
+
+
+def has_inline_value(line: str, key_match: re.Match) -> bool:
+    """True if the key on *line* has its value on the same line, e.g. `"1.0": {folder: all}`."""
+    rest = line[key_match.end():].strip()
+    return bool(rest) and not rest.startswith("#")
+
+
+def first_source_url(path_: pathlib.Path) -> str:
+    """Return the url of the first (most recent) entry in conandata.yml's sources block.
+
+    CCI's layout is rigid enough that a text scan of that entry finds it without
+    parsing the whole file; the round-trip loader is only used when the entry
+    doesn't have a single-line `url:`.
     """
-    sources: CommentedMap = data.get("sources") or CommentedMap()
+    lines = path_.read_text(encoding="utf-8").splitlines(keepends=True)
+    entries, key_indent = version_entries(lines, "sources")
+    if entries:
+        first, key_match = entries[0]
+        if not has_inline_value(lines[first], key_match):
+            for line in lines[first + 1 : entry_end(lines, first, key_indent)]:
+                m = _SOURCE_URL_RE.match(line)
+                if m:
+                    return m.group("url")
+
+    # Mirror lists, flow style, etc.
+    sources: CommentedMap = load_yaml(path_).get("sources") or CommentedMap()
     if not sources:
         raise RuntimeError("Cannot infer repo URL – `conandata.yml` has no sources block")
+    url = next(iter(sources.values()))["url"]
+    return url if isinstance(url, str) else url[0]
 
-    sample_url: str = next(iter(sources.values()))["url"]
 
-    # Capture version fragment that precedes a standard archive suffix (tar.gz/zip/etc.)
-    pattern = re.compile(r"(v?)(\d+\.\d+\.\d+(?:[A-Za-z0-9_-]*)?)(?=\.(?:tar\.gz|zip))")
-    m = pattern.search(sample_url)
-    if not m:
-        # Fallback: stop at first dot that precedes the extension
-        m = re.search(r"(v?)(\d+\.\d+\.\d+(?:[A-Za-z0-9_-]*)?)", sample_url)
+def derive_tarball_url(sample_url: str, new_version: str) -> str:
+    """Return a source URL for *new_version* by cloning *sample_url*.
+
+    We swap **only** the version segment (handling an optional leading "v") and
+    leave everything else – including the `.tar.gz`, `.zip`, or any other
+    extension – untouched.
+    """
+    m = _VERSION_RE.search(sample_url) or _VERSION_RE_LOOSE.search(sample_url)
     if not m:
         raise RuntimeError(f"Unrecognisable version pattern in URL: {sample_url}")
 
@@ -161,13 +240,35 @@ def update_conandata(path_: pathlib.Path, version: str, url: str, sha256: str) -
     return True
 
 
-def update_config(path_: pathlib.Path, version: str) -> bool:
-    if not path_.exists():
-        print(f"[warn] {path_} not found — skipping config.yml update")
-        return False
+def detect_folder(recipe_dir: pathlib.Path) -> str:
+    """Return the sub‑folder that holds the recipe files (CCI “folder”) for the most recent version."""
+    cfg = recipe_dir / "config.yml"
+    if not cfg.exists():
+        return "all"
+
+    lines = cfg.read_text(encoding="utf-8").splitlines(keepends=True)
+    entries, key_indent = version_entries(lines, "versions")
+    if entries:
+        first, key_match = entries[0]             # keep CCI’s “most‑recent‑first” order
+        if not has_inline_value(lines[first], key_match):
+            body = lines[first + 1 : entry_end(lines, first, key_indent)]
+            for line in body:
+                m = _CONFIG_FOLDER_RE.match(line)
+                if m:
+                    return m.group("folder")
+            if not any(_is_content(line) for line in body):
+                return "all"
+
+    # Unusual layout (e.g. flow style), fall back to a real parse
+    versions = load_yaml(cfg).get("versions") or {}
+    if not versions:
+        return "all"
+    return versions[next(iter(versions))].get("folder", "all")
 
-    with path_.open("r", encoding="utf-8") as f:
-        data = yaml_rt.load(f)
+
+def update_config_rt(path_: pathlib.Path, version: str) -> bool:
+    """Comment‑preserving ruamel round-trip version of update_config."""
+    data = load_yaml(path_)
 
     versions: CommentedMap = data.setdefault("versions", CommentedMap())
     quoted_version = DoubleQuotedScalarString(version)
@@ -177,18 +278,54 @@ def update_config(path_: pathlib.Path, version: str) -> bool:
         return False
 
     if not versions:
-        print(f"[warn] config.yml has no existing versions — skipping")
+        print("[warn] config.yml has no existing versions — skipping")
         return False
 
     # Use the first (most recent) version's value as a template
     most_recent_key = next(iter(versions))
-    most_recent_val = versions[most_recent_key]
-    most_recent_val = copy.deepcopy(versions[most_recent_key])
+    versions.insert(0, quoted_version, copy.deepcopy(versions[most_recent_key]))
+
+    save_yaml(path_, data)
 
-    versions.insert(0, quoted_version, most_recent_val)
+    print(f"[info] Added {version} to config.yml (copied from {most_recent_key})")
+    return True
 
-    with path_.open("w", encoding="utf-8") as f:
-        yaml_rt.dump(data, f)
+
+def update_config(path_: pathlib.Path, version: str) -> bool:
+    """Add *version* to config.yml by copying the most recent entry.
+
+    config.yml only holds a flat ``versions:`` map, so rather than a full YAML
+    round-trip we splice a copy of the first entry's lines in textually. This
+    leaves quoting, comments, and the rest of the file byte-for-byte intact.
+    Falls back to update_config_rt when the scan can't find the entries.
+    """
+    if not path_.exists():
+        print(f"[warn] {path_} not found — skipping config.yml update")
+        return False
+
+    lines = path_.read_text(encoding="utf-8").splitlines(keepends=True)
+    entries, key_indent = version_entries(lines, "versions")
+
+    if version in (m.group("key") for _, m in entries):
+        print(f"[skip] config.yml already contains version {version}")
+        return False
+
+    if not entries:
+        # Layout the scan doesn't understand, fall back to a real round-trip
+        return update_config_rt(path_, version)
+
+    # Use the first (most recent) version's lines as a template
+    first, m = entries[0]
+    most_recent_key = m.group("key")
+    template_end = entry_end(lines, first, key_indent)
+
+    key_line = lines[first][: m.start("key")] + version + lines[first][m.end("key") :]
+    template = [key_line] + lines[first + 1 : template_end]
+    if not template[-1].endswith("\n"):
+        template[-1] += "\n"  # entry was the last line of a file without a trailing newline
+    lines[first:first] = template
+
+    path_.write_text("".join(lines), encoding="utf-8")
 
     print(f"[info] Added {version} to config.yml (copied from {most_recent_key})")
     return True
@@ -216,82 +353,32 @@ PR_TEMPLATE = textwrap.dedent(
 )
 
 
-def main():
-    ap = argparse.ArgumentParser(description="Automate version bumps for Conan recipes (comment‑safe)")
-    ap.add_argument("recipe", help="recipe directory, e.g. cpptrace")
-    ap.add_argument("version", help="new semantic version, e.g. 1.0.1")
-    ap.add_argument("--repo-url", help="Override base repo URL if inference fails")
-    ap.add_argument("--prefix", default="jr", help="branch prefix (default: jr)")
-    ap.add_argument("--branch", help="explicit branch name")
-    ap.add_argument("--no-build", action="store_true", help="skip `conan create` build step")
-    ap.add_argument("--no-pr", action="store_true", help="skip GitHub PR creation")
-    ap.add_argument("--push-remote", default="origin", help="remote to push to (default: origin)")
-    ap.add_argument("--rebase-remote", default="upstream", help="remote to rebase against (default: upstream)")
-    args = ap.parse_args()
-
-    # recipe_dir = pathlib.Path("recipes") / args.recipe
-    # conandata = recipe_dir / "all" / "conandata.yml"
-    # if not conandata.exists():
-    #     sys.exit(f"[error] {conandata} not found – bad recipe?")
-
-    recipe_dir = pathlib.Path("recipes") / args.recipe
-    # ────────────────────────────────────────────────────────────────────
-    # Figure out the sub‑folder that holds the recipe files (CCI “folder”)
-    # ────────────────────────────────────────────────────────────────────
-    def detect_folder() -> str:
-        cfg = recipe_dir / "config.yml"
-        if not cfg.exists():
-            return "all"
-
-        cfg_data = load_yaml(cfg)
-        versions = cfg_data.get("versions") or {}
-        if not versions:
-            return "all"
-
-        first_key = next(iter(versions))          # keep CCI’s “most‑recent‑first” order
-        return versions[first_key].get("folder", "all")
-
-    folder: str = detect_folder()
-    conan_subdir = recipe_dir / folder
+def bump(
+    args, recipe: str, version: str, conan_subdir: pathlib.Path, tarball_url: str, sha256: str,
+    github: Optional[GitHubSession],
+):
+    """Branch off master, apply the bump for a single recipe, push, and open the PR."""
+    recipe_dir = pathlib.Path("recipes") / recipe
     conandata = conan_subdir / "conandata.yml"
+    branch = args.branch or f"{args.prefix}/{recipe}-{version}"
 
-    if not conandata.exists():
-        sys.exit(f"[error] {conandata} not found – bad recipe or wrong folder?")
-
-    # Figure out tarball URL
-    if args.repo_url:
-        tarball_url = f"{args.repo_url.rstrip('/')}/archive/refs/tags/v{args.version}.tar.gz"
-    else:
-        data = load_yaml(conandata)
-        tarball_url = derive_tarball_url(data, args.version)
-
-    print(f"[info] Using tarball url {tarball_url}")
-
-    sha256 = compute_sha256(tarball_url)
-
-    branch = args.branch or f"{args.prefix}/{args.recipe}-{args.version}"
-
-    # Git flow
     run(["git", "checkout", "master"])
-    run(["git", "fetch", args.rebase_remote])
-    run(["git", "rebase", f"{args.rebase_remote}/master"])
-    run(["git", "push"])
     run(["git", "checkout", "-b", branch])
 
     # Patch YAML
-    if not update_conandata(conandata, args.version, tarball_url, sha256):
-        print("[info] Nothing to commit; exiting.")
+    if not update_conandata(conandata, version, tarball_url, sha256):
+        print(f"[info] Nothing to commit for {recipe}/{version}.")
         return
 
     configyml = recipe_dir / "config.yml"
-    update_config(configyml, args.version)
+    update_config(configyml, version)
 
     # Optional build
     if not args.no_build:
-        run(f"conan create {conan_subdir}/conanfile.py --version {args.version} --build=missing")
+        run(["conan", "create", f"{conan_subdir}/conanfile.py", "--version", version, "--build=missing"])
 
     # Commit & push
-    commit_msg = f"{args.recipe}: Bump to {args.version}"
+    commit_msg = f"{recipe}: Bump to {version}"
     run(["git", "add", str(conandata), str(configyml)])
     run(["git", "commit", "-m", commit_msg])
 
@@ -300,14 +387,73 @@ def main():
     # PR
     if args.no_pr:
         return
-    if shutil.which("gh"):
-        tmp = tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8")
-        tmp.write(PR_TEMPLATE.format(recipe=args.recipe, version=args.version))
-        tmp.close()
-        run(["gh", "pr", "create", "--fill", "--body-file", tmp.name])
-        os.unlink(tmp.name)
+    if github:
+        pr_url = github.create_pr(
+            branch, "master", commit_msg, PR_TEMPLATE.format(recipe=recipe, version=version)
+        )
+        print(f"[info] Opened {pr_url}")
     else:
-        print("[warn] GitHub CLI not found — open a PR manually for branch", branch)
+        print("[warn] GitHub CLI not available — open a PR manually for branch", branch)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Automate version bumps for Conan recipes (comment‑safe)")
+    ap.add_argument(
+        "bumps", nargs="+", metavar="recipe version",
+        help="one or more recipe directory / new version pairs, e.g. cpptrace 1.0.1",
+    )
+    ap.add_argument("--repo-url", help="Override base repo URL if inference fails")
+    ap.add_argument("--prefix", default="jr", help="branch prefix (default: jr)")
+    ap.add_argument("--branch", help="explicit branch name")
+    ap.add_argument("--no-build", action="store_true", help="skip `conan create` build step")
+    ap.add_argument("--no-pr", action="store_true", help="skip GitHub PR creation")
+    ap.add_argument("--push-remote", default="origin", help="remote to push to (default: origin)")
+    ap.add_argument("--rebase-remote", default="upstream", help="remote to rebase against (default: upstream)")
+    args = ap.parse_args()
+
+    if len(args.bumps) % 2:
+        ap.error("expected recipe/version pairs")
+    pairs = list(zip(args.bumps[::2], args.bumps[1::2]))
+    if len(pairs) > 1 and (args.branch or args.repo_url):
+        ap.error("--branch and --repo-url only apply when bumping a single recipe")
+
+    github = None
+    if not args.no_pr:
+        github = open_github_session(args.rebase_remote, args.push_remote, "bump-conan")
+
+    # Figure out the recipe folder and tarball URL for every bump up front
+    prepared = []
+    for recipe, version in pairs:
+        recipe_dir = pathlib.Path("recipes") / recipe
+        folder: str = detect_folder(recipe_dir)
+        conan_subdir = recipe_dir / folder
+        conandata = conan_subdir / "conandata.yml"
+
+        if not conandata.exists():
+            sys.exit(f"[error] {conandata} not found – bad recipe or wrong folder?")
+
+        if args.repo_url:
+            tarball_url = f"{args.repo_url.rstrip('/')}/archive/refs/tags/v{version}.tar.gz"
+        else:
+            tarball_url = derive_tarball_url(first_source_url(conandata), version)
+
+        print(f"[info] Using tarball url {tarball_url}")
+        prepared.append((recipe, version, conan_subdir, tarball_url))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(prepared))) as pool:
+        # The downloads don't depend on local git state, overlap them with the git flow and with
+        # each other
+        sha256_futures = [pool.submit(compute_sha256, tarball_url) for *_, tarball_url in prepared]
+
+        # Git flow
+        run(["git", "checkout", "master"])
+        run(["git", "fetch", args.rebase_remote])
+        run(["git", "rebase", f"{args.rebase_remote}/master"])
+        run(["git", "push"])
+
+        # Commits and pushes go one at a time from here
+        for (recipe, version, conan_subdir, tarball_url), sha256_future in zip(prepared, sha256_futures):
+            bump(args, recipe, version, conan_subdir, tarball_url, sha256_future.result(), github)
 
 
 if __name__ == "__main__":
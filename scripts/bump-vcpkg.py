@@ -4,19 +4,20 @@ Automate bumping a Vcpkg port to a new version.
 
 Usage:
     ./bump_vcpkg.py cpptrace 1.0.1
+    ./bump_vcpkg.py cpptrace 1.0.1 libassert 2.1.5
 
-Steps:
+Steps (per port, tarballs for all ports are downloaded concurrently up front):
 - Create a new branch (e.g. jr/cpptrace-1.0.1)
 - Update ports/<name>/vcpkg.json version
 - Update ports/<name>/portfile.cmake SHA512 (auto-fetched)
 - Clean installed state and rebuild the port
 - Run `x-add-version` to regenerate the version DB
-- Commit & push both changes
+- Commit & push as a single commit
 - Open a GitHub PR with standard title
 """
 
 import argparse
-import hashlib
+import concurrent.futures
 import os
 import pathlib
 import re
@@ -24,44 +25,66 @@ import shlex
 import shutil
 import subprocess
 import sys
-import tempfile
-import json
 import textwrap
 from typing import Optional
 
+from _bump_common import GitHubSession, open_github_session, tarball_hash
+
+
+_REPO_RE = re.compile(r'REPO\s+([\w\-/]+)')
+_VCPKG_VERSION_RE = re.compile(rb'("version"\s*:\s*)"([^"]*)"')
+_SHA512_RE = re.compile(r'(SHA512)\s+[0-9a-fA-F]{128}')
+
 
 def run(cmd: list[str] | str, *, check=True, shell=False):
     printable = cmd if isinstance(cmd, str) else " ".join(map(shlex.quote, cmd))
     print(f"[exec] {printable}")
+    sys.stdout.flush()
     subprocess.run(cmd, shell=isinstance(cmd, str) or shell, check=check)
 
 
+def _remove_entry(entry: os.DirEntry):
+    if entry.is_dir(follow_symlinks=False):
+        shutil.rmtree(entry.path)
+    else:
+        os.unlink(entry.path)
+
+
+def fast_rmtree(root: str):
+    """rm -rf *root*, deleting its top-level entries in parallel."""
+    print(f"[info] removing {root}")
+    if not os.path.lexists(root):
+        return
+    if os.path.islink(root) or not os.path.isdir(root):
+        # e.g. downloads symlinked to a shared cache: drop the link, not what it points to
+        os.unlink(root)
+        return
+    entries = list(os.scandir(root))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2) as pool:
+        list(pool.map(_remove_entry, entries))
+    os.rmdir(root)
+
+
 def fetch_tarball_sha512(url: str) -> str:
-    import urllib.request
     print(f"[info] downloading {url}")
-    with urllib.request.urlopen(url) as resp:
-        data = resp.read()
-    return hashlib.sha512(data).hexdigest()
+    return tarball_hash(url, "sha512")
 
 
 def update_vcpkg_json(path: pathlib.Path, new_version: str):
-    # content = path.read_text(encoding="utf-8")
-    # updated = re.sub(r'("version"\s*:\s*")\d+\.\d+\.\d+(-[\w\d.]*)?("?)', fr'\1"{new_version}"\3', content)
-    # path.write_text(updated, encoding="utf-8")
-    # print(f"[edit] updated version in {path.relative_to(pathlib.Path.cwd())}")
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    old_version = data.get("version", "")
-    data["version"] = new_version
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-        f.write("\n")  # match vcpkg's style
+    # Targeted edit of the raw bytes so the rest of the manifest is left exactly as it was
+    content = path.read_bytes()
+    m = _VCPKG_VERSION_RE.search(content)
+    if not m:
+        sys.exit(f"[error] Could not find \"version\" field in {path}")
+    old_version = m.group(2).decode()
+    updated = content[: m.start(2)] + new_version.encode() + content[m.end(2) :]
+    path.write_bytes(updated)
     print(f"[edit] updated version {old_version} → {new_version} in {path}")
 
 
 def update_portfile_sha512(path: pathlib.Path, new_sha: str):
     content = path.read_text(encoding="utf-8")
-    updated = re.sub(r'(SHA512)\s+[0-9a-fA-F]{128}', fr'\1 {new_sha}', content)
+    updated = _SHA512_RE.sub(fr'\1 {new_sha}', content)
     path.write_text(updated, encoding="utf-8")
     print(f"[edit] updated SHA512 in {path}")
 
@@ -79,67 +102,84 @@ PR_TEMPLATE = textwrap.dedent(
 )
 
 
-def main():
-    p = argparse.ArgumentParser(description="Automate Vcpkg port version bumps.")
-    p.add_argument("name")
-    p.add_argument("version")
-    p.add_argument("--prefix", default="jr", help="branch prefix (default: jr)")
-    p.add_argument("--branch", help="explicit branch name")
-    p.add_argument("--push-remote", default="origin")
-    p.add_argument("--rebase-remote", default="upstream")
-    args = p.parse_args()
-
-    name = args.name
-    version = args.version
+def bump(args, name: str, version: str, sha512: str, github: Optional[GitHubSession]):
+    """Branch off master, apply the bump for a single port, push, and open the PR."""
     branch = args.branch or f"{args.prefix}/{name}-{version}"
 
     vcpkg_dir = pathlib.Path("ports") / name
     portfile = vcpkg_dir / "portfile.cmake"
     vcpkg_json = vcpkg_dir / "vcpkg.json"
 
-    # Git setup
     run(["git", "checkout", "master"])
-    run(["git", "fetch", args.rebase_remote])
-    run(["git", "rebase", f"{args.rebase_remote}/master"])
-    run(["git", "push"])
     run(["git", "checkout", "-b", branch])
 
-    # Parse repo URL from portfile
-    m = re.search(r'REPO\s+([\w\-/]+)', portfile.read_text())
-    if not m:
-        sys.exit("[error] Could not find REPO line in portfile.cmake")
-    repo = m.group(1)
-    url = f"https://github.com/{repo}/archive/refs/tags/v{version}.tar.gz"
-
-    # Calculate new SHA512
-    sha512 = fetch_tarball_sha512(url)
-
     # Make edits
     update_vcpkg_json(vcpkg_json, version)
     update_portfile_sha512(portfile, sha512)
 
-    # Commit port update
+    # Commit port update (x-add-version computes the git-tree from HEAD, so this has to be committed first)
     run(["git", "commit", "-am", f"[{name}] Bump to {version}"])
 
     # Rebuild and x-add-version
-    run("rm -rf installed packages downloads", shell=True)
+    for d in ("installed", "packages", "downloads"):
+        fast_rmtree(d)
     run(["./vcpkg", "install", name])
     run(["./vcpkg", "x-add-version", name, "--overwrite-version"])
-    run(["git", "commit", "-am", "x-add"])
+    # Fold the version DB update into the bump commit rather than adding a second one
+    run(["git", "commit", "-a", "--amend", "--no-edit"])
 
     # Push
     run(["git", "push", "-u", args.push_remote, branch])
 
     # PR
-    if shutil.which("gh"):
+    if github:
         title = f"[{name}] Bump to {version}"
-        tmp = tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8")
-        tmp.write(PR_TEMPLATE)
-        tmp.close()
-        run(["gh", "pr", "create", "--fill", "--body-file", tmp.name, "--title", title])
-        os.unlink(tmp.name)
+        pr_url = github.create_pr(branch, "master", title, PR_TEMPLATE)
+        print(f"[info] Opened {pr_url}")
     else:
-        print("[warn] GitHub CLI not found – open a PR manually for branch", branch)
+        print("[warn] GitHub CLI not available – open a PR manually for branch", branch)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Automate Vcpkg port version bumps.")
+    p.add_argument("bumps", nargs="+", metavar="name version", help="one or more port name / new version pairs")
+    p.add_argument("--prefix", default="jr", help="branch prefix (default: jr)")
+    p.add_argument("--branch", help="explicit branch name")
+    p.add_argument("--push-remote", default="origin")
+    p.add_argument("--rebase-remote", default="upstream")
+    args = p.parse_args()
+
+    if len(args.bumps) % 2:
+        p.error("expected name/version pairs")
+    pairs = list(zip(args.bumps[::2], args.bumps[1::2]))
+    if len(pairs) > 1 and args.branch:
+        p.error("--branch only applies when bumping a single port")
+
+    github = open_github_session(args.rebase_remote, args.push_remote, "bump-vcpkg")
+
+    # Parse repo URLs from the portfiles
+    urls = []
+    for name, version in pairs:
+        portfile = pathlib.Path("ports") / name / "portfile.cmake"
+        m = _REPO_RE.search(portfile.read_text())
+        if not m:
+            sys.exit(f"[error] Could not find REPO line in {portfile}")
+        repo = m.group(1)
+        urls.append(f"https://github.com/{repo}/archive/refs/tags/v{version}.tar.gz")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(urls))) as pool:
+        # Calculate new SHA512s in the background while the git setup runs
+        sha512_futures = [pool.submit(fetch_tarball_sha512, url) for url in urls]
+
+        # Git setup
+        run(["git", "checkout", "master"])
+        run(["git", "fetch", args.rebase_remote])
+        run(["git", "rebase", f"{args.rebase_remote}/master"])
+        run(["git", "push"])
+
+        # Commits and pushes go one at a time from here
+        for (name, version), sha512_future in zip(pairs, sha512_futures):
+            bump(args, name, version, sha512_future.result(), github)
 
 
 if __name__ == "__main__":
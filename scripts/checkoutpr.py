@@ -17,12 +17,18 @@ Example:
 """
 
 import argparse
+import dataclasses
+import functools
 import subprocess
 import sys
 import re
 from pathlib import Path
 
 
+# Match owner/repo.git from various formats
+_ORIGIN_RE = re.compile(r'[:/](?P<owner>[^/]+)/(?P<repo>[^/]+?)(\.git)?$')
+
+
 # def sh(*cmd: str, **kw):
 #     """Run command, bubble up errors with nice context."""
 #     try:
@@ -35,35 +41,25 @@ from pathlib import Path
 def sh(*cmd: str, **kw):
     """Run a command, echo all its output, return stdout, exit on error."""
     print(f"[checkoutpr] ➕ Running command:\n  {' '.join(cmd)}")
-    try:
-        result = subprocess.run(
-            cmd,
-            text=True,
-            capture_output=True,  # keep output for returning
-            check=True,           # raises on non-zero exit
-            **kw
-        )
-        # Echo everything we captured
-        if result.stdout:
-            sys.stdout.write(result.stdout)
-        if result.stderr:
-            sys.stderr.write(result.stderr)
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        # Make sure any captured output is shown before exiting
-        if e.stdout:
-            sys.stdout.write(e.stdout)
-        if e.stderr:
-            sys.stderr.write(e.stderr)
+    sys.stdout.flush()
+    # stderr (where git writes progress) goes straight to the terminal, stdout is
+    # echoed line by line as it arrives and kept for returning
+    with subprocess.Popen(cmd, text=True, stdout=subprocess.PIPE, bufsize=1, **kw) as proc:
+        lines = []
+        for line in proc.stdout:
+            sys.stdout.write(line)
+            lines.append(line)
+    if proc.returncode:
         print(f"\n[checkoutpr] ❌ Command failed:\n  {' '.join(cmd)}")
-        sys.exit(e.returncode)
+        sys.exit(proc.returncode)
+    return "".join(lines).strip()
 
 
+@functools.lru_cache(maxsize=1)
 def infer_repo_name() -> str:
     try:
         url = sh("git", "remote", "get-url", "origin")
-        # Match owner/repo.git from various formats
-        match = re.search(r'[:/](?P<owner>[^/]+)/(?P<repo>[^/]+?)(\.git)?$', url)
+        match = _ORIGIN_RE.search(url)
         if not match:
             raise ValueError(f"Cannot extract repo name from: {url}")
         return match.group("repo")
@@ -71,17 +67,26 @@ def infer_repo_name() -> str:
         sys.exit(f"[checkoutpr] ❌ Failed to determine current repo name: {e}")
 
 
-def remote_url(user: str) -> str:
-    return f"git@github.com:{user}/{REPO}.git"
+@dataclasses.dataclass(frozen=True)
+class Ctx:
+    user: str
+    branch: str
+    local_branch: str
 
+    @functools.cached_property
+    def repo(self) -> str:
+        # Only needed when setting up the remote, so don't shell out for it otherwise
+        return infer_repo_name()
 
-def ensure_remote(user: str, repo: str):
-    remotes = sh("git", "remote").splitlines()
-    if user not in remotes:
-        print(f"[checkoutpr] ➕ Adding remote '{user}'")
-        sh("git", "remote", "add", user, f"git@github.com:{user}/{repo}.git")
-    else:
-        print(f"[checkoutpr] ✓ Remote '{user}' already exists")
+    @functools.cached_property
+    def remote_ssh(self) -> str:
+        return f"git@github.com:{self.user}/{self.repo}.git"
+
+
+def ensure_remote(ctx: Ctx):
+    # Setting the url directly is idempotent: it creates the remote or rewrites it in place
+    print(f"[checkoutpr] ➕ Configuring remote '{ctx.user}'")
+    sh("git", "config", "--local", f"remote.{ctx.user}.url", ctx.remote_ssh)
 
 
 # def setup_branch(user: str, branch: str, local_branch: str):
@@ -101,18 +106,19 @@ def ensure_remote(user: str, repo: str):
 #         sh("git", "switch", "-c", local_branch, "--track", f"{user}/{branch}")
 
 
-def setup_branch(user: str, branch: str, local_branch: str):
+def setup_branch(ctx: Ctx):
     """Fetch and checkout a local branch from a contributor's remote branch."""
-    print(f"[checkoutpr] ⬇️  fetching {user}/{branch} into {local_branch}")
-    sh("git", "fetch", user, f"{branch}:{local_branch}")
+    print(f"[checkoutpr] ⬇️  fetching {ctx.user}/{ctx.branch} into {ctx.local_branch}")
+    # No need for the fork's tags, only the PR branch
+    sh("git", "fetch", "--no-tags", ctx.user, f"{ctx.branch}:{ctx.local_branch}")
 
-    print(f"[checkoutpr] ↪️  checking out '{local_branch}'")
-    sh("git", "checkout", local_branch)
+    print(f"[checkoutpr] ↪️  checking out '{ctx.local_branch}'")
+    sh("git", "checkout", ctx.local_branch)
 
 
-def push_to_remote(user: str, branch: str):
-    print(f"[checkoutpr] 🚀 pushing HEAD to {user}/{branch}")
-    sh("git", "push", user, f"HEAD:{branch}")
+def push_to_remote(ctx: Ctx):
+    print(f"[checkoutpr] 🚀 pushing HEAD to {ctx.user}/{ctx.branch}")
+    sh("git", "push", ctx.user, f"HEAD:{ctx.branch}")
 
 
 # def cleanup_remote(user: str, local_branch: str):
@@ -122,7 +128,7 @@ def push_to_remote(user: str, branch: str):
 #     print(f"[checkoutpr] 🧹 removing remote '{user}'")
 #     sh("git", "remote", "remove", user)
 
-def cleanup_remote(user: str, local_branch: str):
+def cleanup_remote(ctx: Ctx):
     """
     Delete the temporary local branch and remote.
 
@@ -132,8 +138,8 @@ def cleanup_remote(user: str, local_branch: str):
     # What branch are we on?
     head_branch = sh("git", "rev-parse", "--abbrev-ref", "HEAD")
 
-    if head_branch == local_branch:
-        print(f"[checkoutpr] 🏃 Switching off '{local_branch}' before deletion")
+    if head_branch == ctx.local_branch:
+        print(f"[checkoutpr] 🏃 Switching off '{ctx.local_branch}' before deletion")
         for fallback in ("main", "master"):
             # Does this fallback branch exist?
             exists = sh("git", "branch", "--list", fallback)
@@ -146,11 +152,11 @@ def cleanup_remote(user: str, local_branch: str):
                 "please checkout another branch manually before cleanup."
             )
 
-    print(f"[checkoutpr] 🧹 removing branch '{local_branch}'")
-    sh("git", "branch", "-D", local_branch)
+    print(f"[checkoutpr] 🧹 removing branch '{ctx.local_branch}'")
+    sh("git", "branch", "-D", ctx.local_branch)
 
-    print(f"[checkoutpr] 🧹 removing remote '{user}'")
-    sh("git", "remote", "remove", user)
+    print(f"[checkoutpr] 🧹 removing remote '{ctx.user}'")
+    sh("git", "remote", "remove", ctx.user)
 
 
 def main() -> None:
@@ -168,26 +174,25 @@ def main() -> None:
     if not (Path(".") / ".git").exists():
         sys.exit("[checkoutpr] ❌ Not inside a Git repository")
 
-    repo = infer_repo_name()
-    local_branch = args.local or f"{args.user}-{args.branch}"
+    ctx = Ctx(args.user, args.branch, args.local or f"{args.user}-{args.branch}")
 
     if args.push and args.cleanup:
         sys.exit("[checkoutpr] ❌ Please specify only one action at once")
 
     if args.push:
-        push_to_remote(args.user, args.branch)
+        push_to_remote(ctx)
 
     elif args.cleanup:
-        cleanup_remote(args.user, local_branch)
+        cleanup_remote(ctx)
         print("[checkoutpr] ✨ Remote removed (tracking info stays in this branch).")
 
     else:
-        ensure_remote(args.user, repo)
-        setup_branch(args.user, args.branch, local_branch)
+        ensure_remote(ctx)
+        setup_branch(ctx)
 
         print(
             f"\n[checkoutpr] ✅ All set!\n"
-            f"  • You are now on '{local_branch}', tracking '{args.user}/{args.branch}'.\n"
+            f"  • You are now on '{ctx.local_branch}', tracking '{args.user}/{args.branch}'.\n"
             f"  • Make your edits, commit, then simply run:  git push\n"
             f"    (Git will push to {args.user}/{args.branch} automatically.)\n"
         )
@@ -4,6 +4,7 @@ import argparse
 import subprocess
 import sys
 import os
+import shlex
 from pathlib import Path
 
 EXCLUDES = [
@@ -13,20 +14,34 @@ EXCLUDES = [
     "out"
 ]
 
+# Share one ssh connection between the remote_is_dir check, rsync, and --run
+SSH_OPTS = [
+    "-o", "ControlMaster=auto",
+    "-o", "ControlPersist=60",
+    "-o", "ControlPath=~/.ssh/cm-%C",  # hashed, stays under the unix socket path limit
+]
+
 def find_project_root(start_path):
     """Walk up from start_path until we find a .git directory."""
-    path = Path(start_path).resolve()
-    for parent in [path] + list(path.parents):
-        if (parent / ".git").is_dir():
-            return parent
-    raise FileNotFoundError("Could not find .git directory in any parent folder.")
-
-def build_rsync_command(local_path, remote_path):
+    path = os.path.abspath(start_path)
+    while True:
+        if os.path.isdir(os.path.join(path, ".git")):
+            return Path(path)
+        parent = os.path.dirname(path)
+        if parent == path:
+            raise FileNotFoundError("Could not find .git directory in any parent folder.")
+        path = parent
+
+def build_rsync_command(local_path, remote_path, force_checksum=False):
     cmd = [
         "rsync",
         "-avz",
-        "--checksum"
+        "--partial",
+        "--inplace",
+        "-e", " ".join(["ssh"] + SSH_OPTS),
     ]
+    if force_checksum:
+        cmd.append("--checksum")
     for pattern in EXCLUDES:
         cmd.append(f"--exclude={pattern}")
     cmd.append(f"{local_path}/")  # ensure trailing slash to copy contents
@@ -35,11 +50,11 @@ def build_rsync_command(local_path, remote_path):
 
 def remote_is_dir(remote_host, remote_dir):
     """Check if a path is a directory on the remote host."""
-    check_cmd = ["ssh", remote_host, f"test -d {remote_dir}"]
+    check_cmd = ["ssh", *SSH_OPTS, remote_host, f"test -d {remote_dir}"]
     return subprocess.call(check_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0
 
 def run_remote_command(remote, command):
-    ssh_cmd = ["ssh", remote, command]
+    ssh_cmd = ["ssh", *SSH_OPTS, remote, command]
     return subprocess.call(ssh_cmd)
 
 def main():
@@ -47,6 +62,7 @@ def main():
     parser.add_argument("remote_path", help="Remote destination in form user@host:/path/to/project or user@host:/path/")
     parser.add_argument("--run", help="Command to run on remote after sync", default=None)
     parser.add_argument("--dry-run", action="store_true", help="Show what would be done without executing")
+    parser.add_argument("--force-checksum", action="store_true", help="Compare file checksums instead of mtime and size")
     args = parser.parse_args()
 
     try:
@@ -77,15 +93,15 @@ def main():
         remote_dir = os.path.join(remote_dir, project_name)
 
     remote_full = f"{remote_host}:{remote_dir}"
-    rsync_cmd = build_rsync_command(str(project_root), remote_full)
+    rsync_cmd = build_rsync_command(str(project_root), remote_full, args.force_checksum)
 
     if args.dry_run:
-        print("Rsync command:", " ".join(rsync_cmd))
+        print("Rsync command:", shlex.join(rsync_cmd))
         if args.run:
             print(f"Remote run command: cd {remote_dir} && {args.run}")
         sys.exit(0)
 
-    print("Running:", " ".join(rsync_cmd))
+    print("Running:", shlex.join(rsync_cmd))
     result = subprocess.call(rsync_cmd)
     if result != 0:
         print("Rsync failed", file=sys.stderr)
@@ -25,13 +25,12 @@ def bubble(message: str) -> str:
     top = f" {'_' * (width + 2)} \n"
     bottom = f" {'-' * (width + 2)} \n"
     if len(lines) == 1:
-        middle = f"< {lines[0].ljust(width)} >\n"
+        parts = [f"< {lines[0]:<{width}} >\n"]
     else:
-        middle = f"/ {lines[0].ljust(width)} \\\n"
-        for line in lines[1:-1]:
-            middle += f"| {line.ljust(width)} |\n"
-        middle += f"\\ {lines[-1].ljust(width)} /\n"
-    return top + middle + bottom
+        parts = [f"/ {lines[0]:<{width}} \\\n"]
+        parts.extend(f"| {line:<{width}} |\n" for line in lines[1:-1])
+        parts.append(f"\\ {lines[-1]:<{width}} /\n")
+    return "".join([top, *parts, bottom])
 
 def main():
     msg = sys.argv[1]